@@ -8,14 +8,48 @@ Usage:
 """
 
 import argparse
-import json
 import os
 import sys
-from typing import List, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import uuid
+import ijson
+import orjson
 import psycopg
 from psycopg import sql
-from psycopg.types.json import Json
+from psycopg.adapt import Dumper
+from psycopg.pq import Format
+from psycopg_pool import ConnectionPool
+from psycopg.types.json import Json, set_json_dumps
+
+# Serialize Json(...) params with orjson too (psycopg accepts bytes from dumps)
+set_json_dumps(orjson.dumps)
+
+JSONB_OID = psycopg.postgres.types["jsonb"].oid
+
+
+class OrjsonbTextDumper(Dumper):
+    """Plain dicts -> jsonb text (used by the text-format COPY path)."""
+    oid = JSONB_OID
+
+    def dump(self, obj):
+        return orjson.dumps(obj)
+
+
+class OrjsonbDumper(Dumper):
+    """Plain dicts -> jsonb binary wire format: version byte 1 + orjson's UTF-8 JSON."""
+    format = Format.BINARY
+    oid = JSONB_OID
+
+    def dump(self, obj):
+        return b"\x01" + orjson.dumps(obj)
+
+
+# Binary registered last so it wins for %s params; COPY text picks the text one
+psycopg.adapters.register_dumper(dict, OrjsonbTextDumper)
+psycopg.adapters.register_dumper(dict, OrjsonbDumper)
 
 UUID_NS = uuid.uuid5(uuid.NAMESPACE_DNS, "omvi.local/seed")
 
@@ -27,6 +61,16 @@ DEFAULTS = {
     "DB_PASSWORD": os.getenv("DB_PASSWORD", "galaxy"),
 }
 
+# Tables with at least this many rows are loaded with COPY instead of INSERTs
+COPY_MIN_ROWS = 1000
+# Rows per multi-row INSERT ... VALUES statement on the non-COPY path
+INSERT_PAGE_SIZE = 500
+MAX_BIND_PARAMS = 65535
+# Seed files at least this big are streamed with ijson instead of orjson.loads,
+# handing rows to the DB in batches so a table never sits in memory whole
+STREAM_MIN_BYTES = 64 * 1024 * 1024
+SEED_BATCH_ROWS = 10000
+
 
 
 
@@ -37,89 +81,473 @@ def _split_table(qualified: str) -> Tuple[str, str]:
         return s, t
     return "public", qualified
 
-def _get_column_types(conn, schema: str, table: str, cols: List[str]) -> Dict[str, str]:
+def _get_column_types(cur, schema: str, table: str, cols: List[str]) -> Dict[str, str]:
     q = """
         SELECT column_name, data_type, udt_name
         FROM information_schema.columns
         WHERE table_schema = %s AND table_name = %s AND column_name = ANY(%s)
     """
     types = {}
-    with conn.cursor() as cur:
-        cur.execute(q, (schema, table, cols))
-        for name, data_type, udt_name in cur.fetchall():
-            # geometry shows up as USER-DEFINED + udt_name='geometry'
-            types[name] = udt_name if data_type == 'USER-DEFINED' else data_type
+    cur.execute(q, (schema, table, cols))
+    for name, data_type, udt_name in cur.fetchall():
+        # geometry shows up as USER-DEFINED + udt_name='geometry'
+        types[name] = udt_name if data_type == 'USER-DEFINED' else data_type
     return types
 
-
-def insert_rows(conn, qualified_table: str, cols: List[str], rows: List[Dict[str, Any]]):
-    if not rows:
-        return
+def _get_all_column_types(cur, qualified_tables: List[str]) -> Dict[Tuple[str, str], Dict[str, str]]:
+    """Column types for many tables in one query, keyed by (schema, table)."""
+    pairs = [_split_table(t) for t in qualified_tables]
+    q = """
+        SELECT table_schema, table_name, column_name, data_type, udt_name
+        FROM information_schema.columns
+        WHERE (table_schema, table_name) IN (
+            SELECT * FROM unnest(%s::text[], %s::text[])
+        )
+    """
+    cache: Dict[Tuple[str, str], Dict[str, str]] = {}
+    cur.execute(q, ([s for s, _ in pairs], [t for _, t in pairs]))
+    for schema, table, name, data_type, udt_name in cur.fetchall():
+        cache.setdefault((schema, table), {})[name] = (
+            udt_name if data_type == 'USER-DEFINED' else data_type
+        )
+    return cache
+
+
+# Per-column value adapters. The type dispatch runs once per column (see
+# _column_adapters) instead of once per (row, column).
+def _identity(val: Any):
+    return val
+
+def _adapt_json(val: Any, _Json=Json, _loads=orjson.loads):
+    if val is None:
+        return None
+    if isinstance(val, str):
+        try:
+            return _Json(_loads(val))
+        except Exception:
+            return _Json(val)
+    return _Json(val)
+
+def _adapt_jsonb(val: Any, _Json=Json, _loads=orjson.loads):
+    # dicts go out as-is through the registered Orjsonb dumpers; other JSON
+    # values (lists, scalars) keep the Json wrapper
+    if val is None:
+        return None
+    if isinstance(val, str):
+        try:
+            val = _loads(val)
+        except Exception:
+            return _Json(val)
+    return val if type(val) is dict else _Json(val)
+
+@lru_cache(maxsize=65536)
+def _synthetic_uuid(key: str) -> str:
+    # Stays RFC uuid5 so re-running a seed maps the same keys to the same ids
+    # (ON CONFLICT DO NOTHING relies on that). Cached because the same key shows
+    # up again in every row that references it.
+    return str(uuid.uuid5(UUID_NS, key))
+
+def _adapt_uuid(val: Any, _UUID=uuid.UUID, _synthetic=_synthetic_uuid):
+    if val is None:
+        return None
+    if isinstance(val, _UUID):
+        return str(val)
+    if isinstance(val, str):
+        try:
+            return str(_UUID(val))
+        except Exception:
+            return _synthetic(val)
+    return _synthetic(str(val))
+
+def _adapt_float(val: Any):
+    if val is None:
+        return None
+    try:
+        return float(val)
+    except Exception:
+        return None
+
+def _make_adapter(col_type: str):
+    t = col_type.lower()
+    if t == 'jsonb':
+        return _adapt_jsonb
+    if t == 'json':
+        return _adapt_json
+    if t == 'uuid':
+        return _adapt_uuid
+    # geometry branch removed
+    if t in ('double precision', 'numeric', 'real'):
+        return _adapt_float
+    return _identity
+
+def _column_adapters(cols: List[str], col_types: Dict[str, str]):
+    return [_make_adapter(col_types.get(c) or '') for c in cols]
+
+@lru_cache(maxsize=None)
+def _row_packer(cols: Tuple[str, ...], adapters: tuple):
+    """
+    Compile a row -> value tuple function specialized for one table's columns, e.g.
+        def pack(r, a1=_adapt_uuid):
+            g = r.get
+            return (g('h3_id'), a1(g('id')), ...)
+    Adapters are bound as default args and identity columns skip the call, so the
+    COPY/INSERT loops run one flat function per row with no per-column dispatch.
+    Missing keys become None, like r.get(c).
+    """
+    ns: Dict[str, Any] = {}
+    fields = []
+    for i, (c, adapt) in enumerate(zip(cols, adapters)):
+        if adapt is _identity:
+            fields.append(f"g({c!r})")
+        else:
+            ns[f"a{i}"] = adapt
+            fields.append(f"a{i}(g({c!r}))")
+    defaults = "".join(f", {name}={name}" for name in ns)
+    src = f"def pack(r{defaults}):\n    g = r.get\n    return ({', '.join(fields)},)\n"
+    exec(src, ns)
+    return ns["pack"]
+
+
+# Composed INSERT statements, keyed by (table, cols, rows per statement). The seed
+# tables/columns are fixed, so each statement is only built once per process.
+PREPARED: Dict[Tuple[str, Tuple[str, ...], int], str] = {}
+
+def _insert_stmt(cur, qualified_table: str, cols: List[str], n_rows: int) -> str:
+    key = (qualified_table, tuple(cols), n_rows)
+    stmt = PREPARED.get(key)
+    if stmt is not None:
+        return stmt
     schema, table = _split_table(qualified_table)
-    col_types = _get_column_types(conn, schema, table, cols)
 
-    # Build VALUES and optional casts (we only need casts for special types)
-    placeholders = []
+    # Plain placeholders for every column: no SQL-side casts are needed, values are
+    # already coerced to the column type by the adapters (see _make_adapter)
+    placeholders = [sql.Placeholder()] * len(cols)
     idents = [sql.Identifier(c) for c in cols]
-    for c in cols:
-        t = (col_types.get(c) or '').lower()
-        if t in ('json', 'jsonb'):
-            placeholders.append(sql.Placeholder())
-        elif t == 'geometry':
-            placeholders.append(sql.Placeholder())
-        else:
-            placeholders.append(sql.Placeholder())
 
+    row_tmpl = sql.SQL("({})").format(sql.SQL(", ").join(placeholders))
     stmt = sql.SQL(
-        "INSERT INTO {}.{} ({}) VALUES ({}) ON CONFLICT DO NOTHING"
+        "INSERT INTO {}.{} ({}) VALUES {} ON CONFLICT DO NOTHING"
     ).format(sql.Identifier(schema),
              sql.Identifier(table),
              sql.SQL(", ").join(idents),
-             sql.SQL(", ").join(placeholders))
-
-    def adapt_value(col: str, val: Any, col_types: Dict[str, str]):
-        t = (col_types.get(col) or '').lower()
-        if val is None:
-            return None
-        if t in ('json', 'jsonb'):
-            if isinstance(val, (dict, list, int, float, bool)):
-                return Json(val)
-            if isinstance(val, str):
-                try:
-                    return Json(json.loads(val))
-                except Exception:
-                    return Json(val)
-            return Json(val)
-        if t == 'uuid':
-            if isinstance(val, uuid.UUID):
-                return str(val)
-            if isinstance(val, str):
-                try:
-                    return str(uuid.UUID(val))
-                except Exception:
-                    return str(uuid.uuid5(UUID_NS, val))
-            return str(uuid.uuid5(UUID_NS, str(val)))
-        # geometry branch removed
-        if t in ('double precision', 'numeric', 'real'):
-            try:
-                return float(val)
-            except Exception:
-                return None
-        return val
-
-
-    with conn.cursor() as cur:
+             sql.SQL(", ").join([row_tmpl] * n_rows)).as_string(cur)
+    PREPARED[key] = stmt
+    return stmt
+
+
+def insert_rows(cur, qualified_table: str, cols: List[str], rows: List[Dict[str, Any]],
+                col_types: Optional[Dict[str, str]] = None):
+    if not rows:
+        return
+    schema, table = _split_table(qualified_table)
+    if col_types is None:
+        col_types = _get_column_types(cur, schema, table, cols)
+
+    # Many rows per statement (execute_values style): one parse + one send per page
+    # instead of per row. Postgres caps a statement at 65535 bind parameters.
+    page = max(1, min(INSERT_PAGE_SIZE, MAX_BIND_PARAMS // len(cols)))
+    full_stmt = _insert_stmt(cur, qualified_table, cols, page)
+    pack = _row_packer(tuple(cols), tuple(_column_adapters(cols, col_types)))
+
+    # Run inside a pipeline (see _seed_level): pages are streamed
+    # back-to-back and only the pipeline's Sync waits for the server. Full pages
+    # all reuse one prepared statement (see main).
+    values = list(map(pack, rows))
+    for i in range(0, len(values), page):
+        chunk = values[i:i + page]
+        params = list(chain.from_iterable(chunk))
+        if len(chunk) == page:
+            stmt = full_stmt
+        else:
+            stmt = _insert_stmt(cur, qualified_table, cols, len(chunk))
+        cur.execute(stmt, params)
+
+
+def copy_rows(cur, qualified_table: str, cols: List[str], rows: List[Dict[str, Any]],
+              col_types: Optional[Dict[str, str]] = None):
+    """
+    Bulk-load rows with COPY into a temp staging table, then move them over with
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING so duplicates are still skipped.
+    """
+    if not rows:
+        return
+    schema, table = _split_table(qualified_table)
+    if col_types is None:
+        col_types = _get_column_types(cur, schema, table, cols)
+
+    # Staging table only carries the seeded columns (types, no constraints/defaults),
+    # so the final INSERT behaves exactly like insert_rows for the omitted ones.
+    tmp = sql.Identifier(f"_seed_{schema}_{table}")
+    col_list = sql.SQL(", ").join(sql.Identifier(c) for c in cols)
+    target = sql.SQL("{}.{}").format(sql.Identifier(schema), sql.Identifier(table))
+
+    cur.execute(sql.SQL(
+        "CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA"
+    ).format(tmp, col_list, target))
+
+    # Text format: the server parses each value with the real column type, so
+    # Json/uuid-as-str/arrays don't need an exact binary OID per column.
+    pack = _row_packer(tuple(cols), tuple(_column_adapters(cols, col_types)))
+    with cur.copy(sql.SQL("COPY {} ({}) FROM STDIN").format(tmp, col_list)) as cp:
         for r in rows:
-            vals = [adapt_value(c, r.get(c), col_types) for c in cols]
-            cur.execute(stmt, vals)
+            cp.write_row(pack(r))
+
+    cur.execute(sql.SQL(
+        "INSERT INTO {} ({}) SELECT {} FROM {} ON CONFLICT DO NOTHING"
+    ).format(target, col_list, col_list, tmp))
+    # Drop right away so the same table can be staged again in this transaction
+    cur.execute(sql.SQL("DROP TABLE {}").format(tmp))
+
+
+# Seed order: (key in seed JSON, target table, seeded columns)
+SEED_TABLES: List[Tuple[str, str, List[str]]] = [
+    # 1) hexes
+    ("hexes", "public.hexes", [
+        "h3_id","resolution","country","country_alpha_3","country_alpha_2",
+        # "geom",  <-- removed
+        "lng","lat","h3_cell_area","status","name","boundary_type",
+        "bearing_angle","bearing_label","state_alpha_2","state_fips",
+        "pop_total_h5","housing_total_h5","housing_occupied_h5","pop_density_h5",
+        "hex_estimated_value","hex_starting_bid","hex_current_bid","current_bid_token",
+        "last_updated","number_of_bids","end_date","highest_bidder",
+        "previous_highest_bidder","completion_date","number_of_agents",
+        "number_of_watchers","next_bid"
+    ]),
+
+    # 2) users, affiliate.users
+    ("users", "public.users", [
+        "id","name","email","username","role","is_partner","email_verified","image",
+        "display_username","billing_address","created_at"
+    ]),
+
+    ("affiliate_users", "affiliate.users", [
+        "id","name","email","username","role","is_partner","email_verified","image",
+        "display_username","billing_address","created_at"
+    ]),
+
+    # 3) airnodes
+    ("airnodes", "public.airnodes", [
+        "id","type","purchase_status","initial_puchase_status","initial_purchase_status",
+        "provisioning_status","host_id","operator_id","hardware_cells_ids","updated_at",
+        "parent_id","version","name","batch_name","created_at","deleted_at"
+    ]),
+
+    # 4) nodehost
+    ("nodehost", "public.nodehost", [
+        "id","h3_id","host_name","host_email","agent_name","agent_email","building_id",
+        "building_address","building_height_m","building_type",
+        "lat","lng",  # replaced geom
+        "building_floor_count"
+    ]),
+
+    # 5) sites
+    ("sites", "public.sites", [
+        "id","name","latitude","longitude","country","city","state","hexes","apex_lat","apex_lng"
+    ]),
+
+    # 6) sites_with_airnodes
+    ("sites_with_airnodes", "public.sites_with_airnodes", [
+        "site_id","airnode_id"
+    ]),
+
+    # 7) addresses
+    ("addresses", "public.addresses", [
+        "id","created_at"
+    ]),
+
+    # 8) host_locations
+    ("host_locations", "public.host_locations", [
+        "id","user_id","airnode_id","height","power_supply","hex_id","approved","listed",
+        "longitude","latitude","zipcode","phone","property_phone","address_id",
+        "equipment","instructions",
+        # "geom",  <-- removed
+        "created_at"
+    ]),
+
+    # 9) threads
+    ("threads", "public.threads", [
+        "id","host_location_id","host_id","operator_id","created_at"
+    ]),
+
+    # 10) operators
+    ("operators", "public.operators", [
+        "id","name","description","active","created_at"
+    ]),
+
+    # 11) payments (MOVED EARLIER to satisfy FK in airnode_inventory)
+    ("payments", "public.payments", [
+        "id","provider","provider_id","address_id","currency","total","paid","user_id",
+        "is_expired","bank_transfer_url","bank_transfer_payment_intent_id",
+        "bank_transfer_checkout_session_id","jira_order_id","freshdesk_id","node_ids",
+        "created_at"
+    ]),
+
+    # 12) airnode_inventory (now with all fields)
+    ("airnode_inventory", "public.airnode_inventory", [
+        "id","uuid","model","payment_id","is_reserved",
+        "status_deposit_paid","status_purchased","status_shipped","status_delivered",
+        "status_waiting_on_deployment","status_deployed","status_provisioning","status_active",
+        "created_at"
+    ]),
+
+    # 13) host_location_operator_map
+    ("host_location_operator_map", "public.host_location_operator_map", [
+        "id","host_location_id","operator_id","airnode_inventory_id","thread_id",
+        "host_terms_accepted","operator_terms_accepted","contract_id",
+        "world_mobile_terms_processed","created_at"
+    ]),
+
+    # 14) accounts
+    ("accounts", "public.accounts", [
+        "id","type","provider","provider_account_id","refresh_token","access_token",
+        "expires_at","token_type","scope","id_token","session_state","user_id",
+        "access_token_expires_at","refresh_token_expires_at","password","created_at"
+    ]),
+
+    # 15) admin_actions
+    ("admin_actions", "public.admin_actions", [
+        "id","admin_id","user_id","user_email","action_status","created_at"
+    ]),
+
+    # 16) cdr.earnings
+    ("cdr_earnings", "cdr.earnings", [
+        "id","month_start","month_year_raw","node_id","node_type","affiliate_user_id",
+        "operator_total","host_total","host_operator_total","created_at"
+    ]),
+
+    # 17) cart.user_linked_affiliates
+    ("user_linked_affiliates", "cart.user_linked_affiliates", [
+        "user_id","affiliate_code","created_at"
+    ]),
+]
+
+
+def _seed_batches(path: str, key: str, data: Optional[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    """Rows of one seed section: all at once from `data`, or streamed from `path` in batches."""
+    if data is not None:
+        rows = data.get(key, [])
+        if rows:
+            yield rows
+        return
+    # One incremental pass over the file per section; only one batch is held at a time
+    with open(path, "rb") as f:
+        batch = []
+        for row in ijson.items(f, f"{key}.item", use_float=True):
+            batch.append(row)
+            if len(batch) >= SEED_BATCH_ROWS:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def _tune_seed_transaction(cur):
+    """
+    Relax durability for the current seed transaction only (SET LOCAL): the commit
+    returns without waiting for the WAL flush. A crash can lose the last commit, but
+    never corrupts data, and a lost seed can simply be re-run.
+    """
+    cur.execute("SET LOCAL synchronous_commit = off")
+
+
+def _seed_level(cur, level: List[Tuple[str, str, List[str]]], path: str,
+                data: Optional[Dict[str, Any]],
+                col_types_cache: Dict[Tuple[str, str], Dict[str, str]]):
+    """
+    Load one FK level (see _seed_levels) on `cur`. COPY-sized batches go out as
+    they are read, since COPY can't run in pipeline mode. Every smaller batch of
+    the level is held back and sent through a single pipeline, so all of the
+    level's INSERTs cost one Sync wait instead of one per table.
+    """
+    pending = []
+    for key, qualified_table, cols in level:
+        col_types = col_types_cache.get(_split_table(qualified_table), {})
+        for rows in _seed_batches(path, key, data):
+            if len(rows) >= COPY_MIN_ROWS:
+                copy_rows(cur, qualified_table, cols, rows, col_types)
+            else:
+                # only a table's last (short) batch lands here, so this stays small
+                pending.append((qualified_table, cols, rows, col_types))
+
+    if pending:
+        with cur.connection.pipeline():
+            for qualified_table, cols, rows, col_types in pending:
+                insert_rows(cur, qualified_table, cols, rows, col_types)
+
+
+def _seed_levels(cur, tables: List[Tuple[str, str, List[str]]]) -> List[List[Tuple[str, str, List[str]]]]:
+    """
+    Group seed tables into FK levels: every table only references tables from
+    earlier levels, so tables within one level can be loaded concurrently.
+    Order inside a level follows `tables`.
+    """
+    q = """
+        SELECT cn.nspname, c.relname, fn.nspname, f.relname
+        FROM pg_constraint k
+        JOIN pg_class c      ON c.oid = k.conrelid
+        JOIN pg_namespace cn ON cn.oid = c.relnamespace
+        JOIN pg_class f      ON f.oid = k.confrelid
+        JOIN pg_namespace fn ON fn.oid = f.relnamespace
+        WHERE k.contype = 'f'
+    """
+    seeded = {_split_table(t) for _, t, _ in tables}
+    deps: Dict[Tuple[str, str], set] = {}
+    cur.execute(q)
+    for cs, ct, fs, ft in cur.fetchall():
+        child, parent = (cs, ct), (fs, ft)
+        # self-references are satisfied within the table's own load
+        if child in seeded and parent in seeded and child != parent:
+            deps.setdefault(child, set()).add(parent)
+
+    levels = []
+    done: set = set()
+    pending = list(tables)
+    while pending:
+        level = [e for e in pending if deps.get(_split_table(e[1]), set()) <= done]
+        if not level:
+            raise RuntimeError("FK cycle between seed tables: " + ", ".join(t for _, t, _ in pending))
+        levels.append(level)
+        done.update(_split_table(t) for _, t, _ in level)
+        pending = [e for e in pending if e not in level]
+    return levels
+
+
+def _seed_parallel(dsn: Dict[str, Any], levels, path: str, data: Optional[Dict[str, Any]],
+                   col_types_cache: Dict[Tuple[str, str], Dict[str, str]], jobs: int):
+    """
+    Load each FK level with up to `jobs` tables in flight, one pooled connection per
+    table. Every table commits on its own, so the next level sees its rows; a failure
+    stops the seed but leaves the levels already finished committed.
+    """
+    with ConnectionPool(kwargs={**dsn, "prepare_threshold": 0},
+                        min_size=min(4, jobs), max_size=jobs) as pool, \
+            ThreadPoolExecutor(max_workers=jobs) as ex:
+
+        def load(key, qualified_table, cols):
+            # pool.connection() commits on success, rolls back on error
+            with pool.connection() as conn, conn.cursor() as cur:
+                _tune_seed_transaction(cur)
+                _seed_level(cur, [(key, qualified_table, cols)], path, data, col_types_cache)
+
+        for level in levels:
+            futures = [ex.submit(load, *entry) for entry in level]
+            for fut in futures:
+                fut.result()
+
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--json", required=True, help="Path to seed_data.json")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="Load independent tables on this many connections in parallel "
+                         "(>1 commits per table instead of one all-or-nothing transaction)")
     args = ap.parse_args()
 
-    with open(args.json, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # Small seeds are parsed in one go (orjson); big ones are streamed per section (see _seed_batches)
+    data = None
+    if os.path.getsize(args.json) < STREAM_MIN_BYTES:
+        with open(args.json, "rb") as f:
+            data = orjson.loads(f.read())
 
     dsn = {
         "host": DEFAULTS["DB_HOST"],
@@ -132,135 +560,33 @@ def main():
     print(f"Connecting to postgres://{dsn['user']}@{dsn['host']}:{dsn['port']}/{dsn['dbname']} ...")
     with psycopg.connect(**dsn) as conn:
         conn.autocommit = False
+        # Prepare server-side on first use, not after the default 5 executions
+        conn.prepare_threshold = 0
 
         try:
-            # Seed order:
-            # 1) hexes
-            insert_rows(conn, "public.hexes", [
-            "h3_id","resolution","country","country_alpha_3","country_alpha_2",
-            # "geom",  <-- removed
-            "lng","lat","h3_cell_area","status","name","boundary_type",
-            "bearing_angle","bearing_label","state_alpha_2","state_fips",
-            "pop_total_h5","housing_total_h5","housing_occupied_h5","pop_density_h5",
-            "hex_estimated_value","hex_starting_bid","hex_current_bid","current_bid_token",
-            "last_updated","number_of_bids","end_date","highest_bidder",
-            "previous_highest_bidder","completion_date","number_of_agents",
-            "number_of_watchers","next_bid"
-        ], data.get("hexes", []))
-
-            # 2) users, affiliate.users
-            insert_rows(conn, "public.users", [
-                "id","name","email","username","role","is_partner","email_verified","image",
-                "display_username","billing_address","created_at"
-            ], data.get("users", []))
-
-            insert_rows(conn, "affiliate.users", [
-                "id","name","email","username","role","is_partner","email_verified","image",
-                "display_username","billing_address","created_at"
-            ], data.get("affiliate_users", []))
-
-            # 3) airnodes
-            insert_rows(conn, "public.airnodes", [
-                "id","type","purchase_status","initial_puchase_status","initial_purchase_status",
-                "provisioning_status","host_id","operator_id","hardware_cells_ids","updated_at",
-                "parent_id","version","name","batch_name","created_at","deleted_at"
-            ], data.get("airnodes", []))
-
-            # 4) nodehost
-            insert_rows(conn, "public.nodehost", [
-            "id","h3_id","host_name","host_email","agent_name","agent_email","building_id",
-            "building_address","building_height_m","building_type",
-            "lat","lng",  # replaced geom
-            "building_floor_count"
-        ], data.get("nodehost", []))
-
-
-            # 5) sites
-            insert_rows(conn, "public.sites", [
-                "id","name","latitude","longitude","country","city","state","hexes","apex_lat","apex_lng"
-            ], data.get("sites", []))
-
-            # 6) sites_with_airnodes
-            insert_rows(conn, "public.sites_with_airnodes", [
-                "site_id","airnode_id"
-            ], data.get("sites_with_airnodes", []))
-
-            # 7) addresses
-            insert_rows(conn, "public.addresses", [
-                "id","created_at"
-            ], data.get("addresses", []))
-
-            # 8) host_locations
-            insert_rows(conn, "public.host_locations", [
-            "id","user_id","airnode_id","height","power_supply","hex_id","approved","listed",
-            "longitude","latitude","zipcode","phone","property_phone","address_id",
-            "equipment","instructions",
-            # "geom",  <-- removed
-            "created_at"
-        ], data.get("host_locations", []))
-
-
-            # 9) threads
-            insert_rows(conn, "public.threads", [
-                "id","host_location_id","host_id","operator_id","created_at"
-            ], data.get("threads", []))
-
-            # 10) operators
-            insert_rows(conn, "public.operators", [
-                "id","name","description","active","created_at"
-            ], data.get("operators", []))
-
-            # 11) payments (MOVED EARLIER to satisfy FK in airnode_inventory)
-            insert_rows(conn, "public.payments", [
-                "id","provider","provider_id","address_id","currency","total","paid","user_id",
-                "is_expired","bank_transfer_url","bank_transfer_payment_intent_id",
-                "bank_transfer_checkout_session_id","jira_order_id","freshdesk_id","node_ids",
-                "created_at"
-            ], data.get("payments", []))
-
-            # 12) airnode_inventory (now with all fields)
-            insert_rows(conn, "public.airnode_inventory", [
-                "id","uuid","model","payment_id","is_reserved",
-                "status_deposit_paid","status_purchased","status_shipped","status_delivered",
-                "status_waiting_on_deployment","status_deployed","status_provisioning","status_active",
-                "created_at"
-            ], data.get("airnode_inventory", []))
-
-            # 13) host_location_operator_map
-            insert_rows(conn, "public.host_location_operator_map", [
-                "id","host_location_id","operator_id","airnode_inventory_id","thread_id",
-                "host_terms_accepted","operator_terms_accepted","contract_id",
-                "world_mobile_terms_processed","created_at"
-            ], data.get("host_location_operator_map", []))
-
-            # 14) accounts
-            insert_rows(conn, "public.accounts", [
-                "id","type","provider","provider_account_id","refresh_token","access_token",
-                "expires_at","token_type","scope","id_token","session_state","user_id",
-                "access_token_expires_at","refresh_token_expires_at","password","created_at"
-            ], data.get("accounts", []))
-
-            # 15) admin_actions
-            insert_rows(conn, "public.admin_actions", [
-                "id","admin_id","user_id","user_email","action_status","created_at"
-            ], data.get("admin_actions", []))
-
-            # 16) cdr.earnings
-            insert_rows(conn, "cdr.earnings", [
-                "id","month_start","month_year_raw","node_id","node_type","affiliate_user_id",
-                "operator_total","host_total","host_operator_total","created_at"
-            ], data.get("cdr_earnings", []))
-
-            # 17) cart.user_linked_affiliates
-            insert_rows(conn, "cart.user_linked_affiliates", [
-                "user_id","affiliate_code","created_at"
-            ], data.get("user_linked_affiliates", []))
-
-            conn.commit()
+            # One cursor for introspection + every insert, so all statements share
+            # the connection's prepared-statement cache and pipeline
+            with conn.cursor() as cur:
+                # One information_schema round-trip for every table below
+                col_types_cache = _get_all_column_types(cur, [t for _, t, _ in SEED_TABLES])
+
+                levels = _seed_levels(cur, SEED_TABLES)
+
+                if args.jobs > 1:
+                    conn.commit()  # nothing written here; just close the introspection transaction
+                    _seed_parallel(dsn, levels, args.json, data, col_types_cache, args.jobs)
+                else:
+                    _tune_seed_transaction(cur)
+                    for level in levels:
+                        _seed_level(cur, level, args.json, data, col_types_cache)
+                    conn.commit()
             print("✅ Seed completed.")
         except Exception as e:
             conn.rollback()
-            print("❌ Error during seeding, rolled back:", e)
+            if args.jobs > 1:
+                print("❌ Error during parallel seeding (finished FK levels stay committed):", e)
+            else:
+                print("❌ Error during seeding, rolled back:", e)
             sys.exit(1)
 
 
@@ -14,6 +14,7 @@ DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 
 def wait_for_db(max_seconds=120):
     start = time.time()
+    delay = 0.1  # poll fast at first, back off x1.5 up to 2s
     while True:
         try:
             with psycopg.connect(
@@ -22,22 +23,24 @@ def wait_for_db(max_seconds=120):
                 dbname=DB_NAME,
                 user=DB_USER,
                 password=DB_PASSWORD,
-                connect_timeout=3,
+                connect_timeout=2,  # libpq/psycopg raise anything lower to 2s
                 autocommit=True,
             ) as conn:
                 with conn.cursor() as cur:
-                    cur.execute("SELECT 1;")
-                    print("✅ Database is ready")
-                    return
+                    # accepting connections isn't enough: a standby/recovering server rejects writes
+                    cur.execute("SELECT NOT pg_is_in_recovery();")
+                    if cur.fetchone()[0]:
+                        print("✅ Database is ready")
+                        return
+                    raise RuntimeError("Database is still in recovery")
         except Exception as e:
             if time.time() - start > max_seconds:
                 raise RuntimeError(f"Database not ready after {max_seconds}s") from e
             print("⏳ Waiting for database...")
-            time.sleep(2)
+            time.sleep(delay)
+            delay = min(delay * 1.5, 2.0)
 
 def run_sql_file(path):
-    with open(path, "r", encoding="utf-8") as f:
-        sql = f.read()
     print(f"📜 Executing {path}")
     with psycopg.connect(
         host=DB_HOST,
@@ -47,8 +50,11 @@ def run_sql_file(path):
         password=DB_PASSWORD,
         autocommit=True,
     ) as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql)
+        # One simple-protocol execute for the whole script: splitting it client-side
+        # (sqlparse) re-tokenizes everything in Python and costs far more memory and
+        # time than the single round trip it replaces.
+        with open(path, "r", encoding="utf-8") as f, conn.cursor() as cur:
+            cur.execute(f.read())
     print("✅ Schema applied successfully")
 
 if __name__ == "__main__":
@@ -2,12 +2,14 @@
 FastAPI + Scrapy(+Playwright) crawler that:
 - Accepts JSON: {"url": "<base-url>", "depth": <int>}
 - Crawls only the same site up to given depth (0=only base page, 1=base + its links, 2=...).
-- Writes ONE PDF per visited URL to a temp folder (clean, visible text only).
-- Returns a ZIP with all PDFs.
+- Renders ONE PDF per visited URL in memory (clean, visible text only).
+- Streams back a ZIP with all PDFs as pages finish.
 
 Run:
   pip install -r requirements.txt
   uvicorn app:app --reload
+  (uvicorn[standard] already runs on uvloop; pass --loop uvloop to require it.
+   The reactor below is installed on whatever loop uvicorn is running.)
 Test:
   curl -X POST "http://127.0.0.1:8000/scrape" -H "Content-Type: application/json" \
        -d '{"url":"https://example.com", "depth":1}' --output result.zip
@@ -39,10 +41,12 @@ except Exception:
 # ---------------------------
 import io
 import re
+import logging
 import zipfile
-import tempfile
 import hashlib
+import posixpath
 import datetime
+from functools import lru_cache
 from urllib.parse import urlparse, urldefrag, urlsplit, urlunsplit, parse_qsl, urlencode
 from pathlib import Path
 import shutil
@@ -53,7 +57,7 @@ import sys
 # FastAPI / Pydantic
 # ---------------------------
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, HttpUrl, Field
 
 # ---------------------------
@@ -61,23 +65,24 @@ from pydantic import BaseModel, HttpUrl, Field
 # ---------------------------
 import scrapy
 from scrapy.crawler import CrawlerRunner
-from scrapy.linkextractors import LinkExtractor
 from scrapy.utils.log import configure_logging
+from scrapy_playwright.page import PageMethod
 
 # ---------------------------
 # PDF (ReportLab)
 # ---------------------------
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_LEFT
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
 
 # ---------------------------
 # HTML parsing / cleaning
 # ---------------------------
-from lxml import html
+from lxml import etree, html
 from lxml.html.clean import Cleaner
+from selectolax.lexbor import LexborHTMLParser
 
 # ---------------------------
 # Playwright (browser bootstrap)
@@ -120,16 +125,19 @@ def ensure_playwright_browsers():
 class CrawlRequest(BaseModel):
     url: HttpUrl = Field(..., description="Base site URL to start scraping")
     depth: int = Field(1, ge=0, le=5, description="Crawl depth (0=only base page, 1=base+its links, 2=their links too, ...)")
+    wait_networkidle: bool = Field(False, description="SPAs only: wait for network idle (slow) before reading rendered pages")
 
 # ---------------------------
 # Utilities
 # ---------------------------
+# Pure str -> str helpers run for every crawled/followed URL; cache the repeats
+@lru_cache(maxsize=65536)
 def same_site_allowed_domains(base_url: str):
     parsed = urlparse(base_url)
     host = (parsed.hostname or "").lower()
     allow = set()
     if not host:
-        return []
+        return ()
     allow.add(host)
     # add apex (example.com) and www.example.com variants both ways
     naked = host[4:] if host.startswith("www.") else host
@@ -138,19 +146,28 @@ def same_site_allowed_domains(base_url: str):
     parts = naked.split(".")
     if len(parts) > 2:
         allow.add(".".join(parts[-2:]))
-    return list(allow)
+    return tuple(allow)  # immutable: the cached value is shared between callers
 
+_NON_ALNUM_RE = re.compile(r"[^a-zA-Z0-9]+")
+
+@lru_cache(maxsize=65536)
 def sanitize_filename_from_url(url: str) -> str:
     clean_url, _ = urldefrag(url)  # remove #fragment
-    h = hashlib.md5(clean_url.encode("utf-8")).hexdigest()[:10]
+    h = hashlib.blake2b(clean_url.encode("utf-8"), digest_size=5).hexdigest()  # 10 hex chars
     parsed = urlparse(clean_url)
-    stem = re.sub(r"[^a-zA-Z0-9]+", "-", f"{parsed.netloc}{parsed.path}")[:80].strip("-")
+    stem = _NON_ALNUM_RE.sub("-", f"{parsed.netloc}{parsed.path}")[:80].strip("-")
     return f"{stem or 'page'}-{h}.pdf"
 
+_TRACK_EXACT = frozenset({"fbclid", "gclid", "mc_eid"})
+
+@lru_cache(maxsize=65536)
 def _strip_tracking(u: str) -> str:
+    # Most links carry no query/fragment: nothing to strip, skip the split/rebuild
+    if "?" not in u and "#" not in u:
+        return u
     sp = urlsplit(u)
     q = [(k, v) for k, v in parse_qsl(sp.query, keep_blank_values=True)
-         if not k.lower().startswith(("utm_", "fbclid", "gclid", "mc_eid"))]
+         if (kl := k.lower()) not in _TRACK_EXACT and not kl.startswith("utm_")]
     return urlunsplit((sp.scheme, sp.netloc, sp.path, urlencode(q), ""))  # drop fragment
 
 # ---------------------------
@@ -170,68 +187,122 @@ CLEANER = Cleaner(
     ],
 )
 
-HIDE_XPATH = (
-    '//*[@hidden or @aria-hidden="true" or contains(@style,"display:none") '
-    'or contains(@style,"visibility:hidden")]'
+def _is_hidden(attrs) -> bool:
+    # hidden / aria-hidden="true" / inline display:none or visibility:hidden
+    if "hidden" in attrs or attrs.get("aria-hidden") == "true":
+        return True
+    style = attrs.get("style")
+    return bool(style) and ("display:none" in style or "visibility:hidden" in style)
+
+# selectolax twin of CLEANER (+ _is_hidden) for the fast path below
+STRIP_TAGS = [
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "picture",
+    "source", "video", "audio", "track", "map", "area", "button", "input", "select",
+    "textarea", "object", "embed", "applet", "frame", "frameset", "link", "meta",
+]
+HIDE_CSS = (
+    '[hidden], [aria-hidden="true"], [style*="display:none"], [style*="visibility:hidden"]'
 )
 
+def parse_html(document_html: str):
+    """Parse once with selectolax (see visible_text_from_tree)."""
+    try:
+        return LexborHTMLParser(document_html)
+    except Exception:
+        return None
+
 def visible_text_from_html(document_html: str, base_url: str) -> str:
     """
     Keep all human-visible text from the rendered DOM while removing scripts, styles,
     hidden elements, and UI-only controls. Avoids dropping real content (no "main-only"
     heuristics). Produces normalized, readable paragraphs.
     """
+    return visible_text_from_tree(parse_html(document_html), base_url, document_html)
+
+def visible_text_from_tree(tree, base_url: str, document_html: str = None) -> str:
+    """
+    visible_text_from_html on an already parsed tree (see parse_html). The tree is
+    stripped in place, so read anything else from it (e.g. meta) first.
+    """
+    # Fast path: selectolax (lexbor) strip; lxml Cleaner only as a fallback
+    try:
+        text = _raw_visible_text_selectolax(tree)
+    except Exception:
+        if document_html is None:
+            document_html = tree.html if tree is not None else ""
+        text = _raw_visible_text_lxml(document_html, base_url)
+        if text is None:
+            # fallback: crude text-only if parsing fails
+            return " ".join(document_html.split())
+    return _normalize_text(text)
+
+def _raw_visible_text_selectolax(tree) -> str:
+    tree.strip_tags(STRIP_TAGS)
+    # One query, then decompose in reverse document order: descendants go before
+    # their ancestors, so we never touch a node a parent's decompose() already freed
+    for node in reversed(tree.css(HIDE_CSS)):
+        node.decompose()
+    root = tree.body or tree.root
+    if root is None:
+        return ""
+    # Same concatenation as lxml's text_content(); whitespace is fixed up afterwards
+    return root.text(deep=True, separator="", strip=False)
+
+def _raw_visible_text_lxml(document_html: str, base_url: str):
     # Parse + base URL for proper handling of relative links (if needed later)
     try:
         root = html.fromstring(document_html, base_url=str(base_url))
     except Exception:
-        # fallback: crude text-only if parsing fails
-        return " ".join(document_html.split())
+        return None
 
-    # Clean heavy non-text elements / JS / CSS
-    root = CLEANER.clean_html(root)
-
-    # Remove hidden elements (common cases)
-    for el in root.xpath(HIDE_XPATH):
-        parent = el.getparent()
-        if parent is not None:
-            parent.remove(el)
+    # Remove hidden elements (common cases) in one walk. Must run before CLEANER:
+    # it strips the hidden/style attributes (safe_attrs_only, inline_style).
+    # Snapshot first: we mutate while walking. drop_tree() keeps the tail text,
+    # like selectolax's decompose().
+    for el in list(root.iter(etree.Element)):
+        if el.getparent() is not None and _is_hidden(el.attrib):
+            el.drop_tree()
 
-    # Remove elements that are practically empty or purely decorative
-    for el in root.xpath('//*[self::svg or self::canvas or self::picture or self::source]'):
-        parent = el.getparent()
-        if parent is not None:
-            parent.remove(el)
+    # Clean heavy non-text elements / JS / CSS (svg/canvas/picture/source via kill_tags)
+    root = CLEANER.clean_html(root)
 
     # Get full visible text content
-    text = root.text_content()
+    return root.text_content()
+
+# Whitespace / paragraph regexes, compiled once (run on every page)
+_WS_RE = re.compile(r"[ \t\r\f\v]+")
+_BLANKS3 = re.compile(r"\n{3,}")
+_BLANKS2 = re.compile(r"\n{2,}")
+# Extra line boundaries str.splitlines() honours (\r\f\v are already spaces by then)
+_LINE_SEP_RE = re.compile("[\x1c-\x1e\x85\u2028\u2029]")
+# Whitespace (Unicode included, as str.strip) hugging a newline on either side:
+# the per-line strip in one pass
+_EDGE_WS = re.compile(r"[^\S\n]+\n[^\S\n]*|\n[^\S\n]+")
+_PARA_SPLIT = re.compile(r"\n\s*\n")
+# A whole line (and its newline) that is either a long stylesheet/JS-y dump
+# (> 300 chars with a telltale token) or has more than 4 of "{", "}", ";"
+_JUNK_LINE = re.compile(
+    r"^(?:(?=.{301})(?=.*(?::hover|:root|@media|function\(|var )).*"
+    r"|(?:[^{};\n]*[{};]){5}.*)$\n?",
+    re.MULTILINE,
+)
 
+def _normalize_text(text: str) -> str:
     # Normalize whitespace (collapse runs, keep sentence spacing)
-    text = re.sub(r"[ \t\r\f\v]+", " ", text)
+    text = _WS_RE.sub(" ", text)
     # Normalize weird NBSPs etc.
     text = text.replace("\xa0", " ")
     # Convert multiple blank lines to just one
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _BLANKS3.sub("\n\n", text)
     # Add basic paragraph boundaries based on block-ish tags by re-parsing nodes (lightweight)
     # (This is kept simple to avoid over-aggressive splitting.)
-    text = "\n".join(line.strip() for line in text.splitlines())
-    text = re.sub(r"\n{2,}", "\n\n", text).strip()
+    text = _LINE_SEP_RE.sub("\n", text)
+    text = _EDGE_WS.sub("\n", text)
+    text = _BLANKS2.sub("\n\n", text).strip()
 
     # Heuristic: drop lines that look like leftover CSS/JS (very rare after CLEANER, but safe)
-    lines = []
-    for ln in text.splitlines():
-        s = ln.strip()
-        if not s:
-            lines.append("")  # preserve paragraph breaks
-            continue
-        if len(s) > 300 and any(tok in s for tok in (":hover", ":root", "@media", "function(", "var ")):
-            # likely leftover stylesheet or JS-y dump
-            continue
-        if s.count("{") + s.count("}") + s.count(";") > 4:
-            continue
-        lines.append(s)
-    text = "\n".join(lines)
-    text = re.sub(r"\n{3,}", "\n\n", text).strip()
+    text = _JUNK_LINE.sub("", text)
+    text = _BLANKS3.sub("\n\n", text).strip()
 
     return text
 
@@ -242,16 +313,15 @@ META_WHITELIST = {
     "description", "og:title", "og:description", "twitter:title", "twitter:description"
 }
 
-def meta_as_text(document_html: str) -> str:
-    try:
-        root = html.fromstring(document_html)
-    except Exception:
-        return ""
+def meta_as_text_from_response(response) -> str:
+    # response.xpath works on Scrapy's own parsed tree (already built for <title>),
+    # so reading <meta> costs no extra HTML parse
     parts = []
-    for tag in root.xpath("//meta[@content]"):
-        name = (tag.get("name") or tag.get("property") or "").strip().lower()
+    for tag in response.xpath("//meta[@content]"):
+        attrs = tag.attrib
+        name = (attrs.get("name") or attrs.get("property") or "").strip().lower()
         if name in META_WHITELIST:
-            content = (tag.get("content") or "").strip()
+            content = (attrs.get("content") or "").strip()
             if content:
                 parts.append(f"{name}: {content}")
     return "\n".join(parts)
@@ -259,81 +329,148 @@ def meta_as_text(document_html: str) -> str:
 # ---------------------------
 # PDF builder
 # ---------------------------
-def make_pdf(path: str, payload: dict):
-    """
-    Create a PDF for one page.
-    payload keys: url, title, fetched_at, meta, text, outgoing_links
-    """
-    styles = getSampleStyleSheet()
-    normal = ParagraphStyle(
-        "Body",
-        parent=styles["Normal"],
-        alignment=TA_LEFT,
-        fontSize=10,
-        leading=13,
-    )
-    h1 = styles["Heading1"]
-    h2 = styles["Heading2"]
-    h3 = styles["Heading3"]
+BODY_FONT, BODY_SIZE, BODY_LEADING = "Helvetica", 10, 13
+BOLD_FONT = "Helvetica-Bold"
+MARGIN = inch
+
+
+def _wrap(text: str, font: str, size: float, width: float):
+    """simpleSplit on spaces, then hard-cut any single word wider than the line."""
+    for line in simpleSplit(text, font, size, width):
+        w = stringWidth(line, font, size)
+        if w <= width:
+            yield line
+            continue
+        step = max(1, int(len(line) * width / w))
+        for k in range(0, len(line), step):
+            yield line[k:k + step]
 
-    doc = SimpleDocTemplate(path, pagesize=A4, title=payload.get("title") or payload["url"])
-    story = []
 
-    story.append(Paragraph(payload.get("title") or "(No title)", h1))
-    story.append(Paragraph(payload["url"], normal))
-    story.append(Spacer(1, 0.15 * inch))
+def make_pdf_bytes(payload: dict) -> bytes:
+    """
+    Create a PDF for one page and return its bytes.
+    payload keys: url, title, fetched_at, meta, text, outgoing_links
 
-    # story.append(Paragraph("Fetched at", h2))
-    # story.append(Paragraph(payload["fetched_at"], normal))
-    story.append(Spacer(1, 0.1 * inch))
+    Drawn straight onto a canvas (title + plain paragraphs) instead of going
+    through Platypus flowables; text is written as-is, no markup parsing.
+    """
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    c.setTitle(payload.get("title") or payload["url"])
+    page_w, page_h = A4
+    width = page_w - 2 * MARGIN
+    y = page_h - MARGIN
+
+    def write(text, font=BODY_FONT, size=BODY_SIZE, leading=BODY_LEADING):
+        nonlocal y
+        c.setFont(font, size)
+        for line in _wrap(text, font, size, width):
+            if y < MARGIN:
+                c.showPage()
+                c.setFont(font, size)
+                y = page_h - MARGIN
+            c.drawString(MARGIN, y, line)
+            y -= leading
+
+    def gap(h):
+        nonlocal y
+        y -= h
+
+    write(payload.get("title") or "(No title)", BOLD_FONT, 18, 22)
+    write(payload["url"])
+    gap(0.25 * inch)
 
     # META WRITING
     # if payload.get("meta"):
-    #     story.append(Paragraph("Meta", h2))
+    #     write("Meta", BOLD_FONT, 14, 18)
     #     for line in payload["meta"].splitlines():
     #         if line.strip():
-    #             story.append(Paragraph(line.strip(), normal))
-    #     story.append(Spacer(1, 0.15 * inch))
+    #             write(line.strip())
+    #     gap(0.15 * inch)
 
     if payload.get("text"):
-        story.append(Paragraph("Page Text", h2))
-        # Split into paragraphs on blank lines if present; else chunk smartly.
-        raw = payload["text"]
-
-        # Prefer to keep author-supplied paragraphs if any:
-        paragraphs = re.split(r"\n\s*\n", raw.strip())
-        if len(paragraphs) < 2:  # fallback: break by long length
-            paragraphs = [raw]
-
-        for para in paragraphs:
+        write("Page Text", BOLD_FONT, 14, 18)
+        # Split into paragraphs on blank lines; simpleSplit wraps long ones
+        for para in _PARA_SPLIT.split(payload["text"].strip()):
             para = para.strip()
             if not para:
                 continue
-            # further chunk very long paragraphs to avoid ReportLab layout blowups
-            while para:
-                chunk = para[:1600]
-                cut = chunk.rfind(" ")
-                if cut == -1 or len(para) <= 1600:
-                    piece = para
-                    para = ""
-                else:
-                    piece = para[:cut]
-                    para = para[cut + 1:]
-                story.append(Paragraph(piece, normal))
-                story.append(Spacer(1, 0.05 * inch))
+            write(para)
+            gap(0.05 * inch)
 
     #OUTGOING LINKS
     # if payload.get("outgoing_links"):
-    #     story.append(Spacer(1, 0.15 * inch))
-    #     story.append(Paragraph("Outgoing links discovered", h3))
+    #     gap(0.15 * inch)
+    #     write("Outgoing links discovered", BOLD_FONT, 12, 16)
     #     for href in payload["outgoing_links"][:250]:
-    #         story.append(Paragraph(href, normal))
+    #         write(href)
 
-    doc.build(story)
+    c.save()
+    return buf.getvalue()
+
+# ---------------------------
+# Static first, Playwright only when needed
+# ---------------------------
+# Below this many chars of visible text a plain-HTTP page is assumed to be a JS shell
+MIN_STATIC_TEXT_CHARS = 200
+
+
+# We only read the DOM text: never let Chromium fetch these
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+
+
+def _abort_heavy_request(request) -> bool:
+    """PLAYWRIGHT_ABORT_REQUEST predicate (gets a playwright Request)."""
+    return request.resource_type in BLOCKED_RESOURCE_TYPES
+
+
+class PlaywrightFallbackMiddleware:
+    """
+    Pages are fetched over plain HTTP first. When the static HTML has (almost) no
+    visible text, or the plain client got a 403, re-issue the same request through
+    Playwright. Returning the request from here keeps its meta (depth included),
+    so the retry doesn't count as a deeper hop.
+    """
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_response(self, request, response, spider=None):
+        # newer Scrapy stops passing `spider` to middlewares; go through the crawler
+        spider = self.crawler.spider
+        if request.meta.get("playwright"):
+            return response
+        if response.status == 403:
+            return request.replace(meta={**request.meta, **spider.playwright_meta()}, dont_filter=True)
+        if response.status != 200 or not isinstance(response, scrapy.http.HtmlResponse):
+            return response
+
+        doc_html = response.text
+        text = visible_text_from_tree(parse_html(doc_html), base_url=response.url, document_html=doc_html)
+        if len(text) < MIN_STATIC_TEXT_CHARS:
+            spider.logger.debug(f"Static text too short, rendering with Playwright: {response.url}")
+            return request.replace(meta={**request.meta, **spider.playwright_meta()}, dont_filter=True)
+        # Already extracted: hand it to parse() instead of doing it twice
+        request.meta["visible_text"] = text
+        return response
 
 # ---------------------------
 # Scrapy spider
 # ---------------------------
+# Same UA for plain-HTTP fetches and the shared Playwright context
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+PLAYWRIGHT_CONTEXT_KWARGS = {
+    "java_script_enabled": True,
+    "viewport": {"width": 1280, "height": 800},
+    "user_agent": USER_AGENT,
+}
+
 class SiteToPDFSpider(scrapy.Spider):
     name = "site_to_pdf"
     custom_settings = {
@@ -341,17 +478,17 @@ class SiteToPDFSpider(scrapy.Spider):
         "DOWNLOAD_TIMEOUT": 60,
         "RETRY_ENABLED": True,
         "RETRY_TIMES": 4,
-        "CONCURRENT_REQUESTS": 8,
+        # Plain HTTP by default, so the downloader can actually run wide
+        "CONCURRENT_REQUESTS": 32,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 16,
+        "SCHEDULER_PRIORITY_QUEUE": "scrapy.pqueues.DownloaderAwarePriorityQueue",
         "AUTOTHROTTLE_ENABLED": True,
         "AUTOTHROTTLE_START_DELAY": 0.5,
         "AUTOTHROTTLE_MAX_DELAY": 8.0,
         "AUTOTHROTTLE_TARGET_CONCURRENCY": 4.0,
         "COOKIES_ENABLED": False,
         "REDIRECT_ENABLED": True,
-        "USER_AGENT": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
-        ),
+        "USER_AGENT": USER_AGENT,
         "DEFAULT_REQUEST_HEADERS": {
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.9",
@@ -360,7 +497,7 @@ class SiteToPDFSpider(scrapy.Spider):
             "Upgrade-Insecure-Requests": "1",
         },
 
-        # Ensure we use Playwright handler
+        # Playwright handler; requests without meta["playwright"] go through plain HTTP
         "DOWNLOAD_HANDLERS": {
             "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
             "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
@@ -368,6 +505,14 @@ class SiteToPDFSpider(scrapy.Spider):
         "PLAYWRIGHT_BROWSER_TYPE": "chromium",
         "PLAYWRIGHT_DEFAULT_NAVIGATION_TIMEOUT": 60000,
         "PLAYWRIGHT_LAUNCH_OPTIONS": {"headless": True},
+        "PLAYWRIGHT_ABORT_REQUEST": _abort_heavy_request,
+        # One shared context (created lazily on the first rendered request, see
+        # playwright_meta; no startup contexts, so plain-HTTP crawls never launch
+        # Chromium); pages capped at the per-domain concurrency. We never ask for
+        # the Page object (playwright_include_page stays False) so the handler
+        # closes pages itself.
+        "PLAYWRIGHT_MAX_CONTEXTS": 1,
+        "PLAYWRIGHT_MAX_PAGES_PER_CONTEXT": 16,
 
         # Crawl breadth-first so shallow pages (depth 0/1) finish first
         "DEPTH_PRIORITY": 1,
@@ -378,24 +523,72 @@ class SiteToPDFSpider(scrapy.Spider):
         "SPIDER_MIDDLEWARES": {
             "scrapy.spidermiddlewares.httperror.HttpErrorMiddleware": 50,
         },
+        "DOWNLOADER_MIDDLEWARES": {
+            PlaywrightFallbackMiddleware: 543,
+        },
     }
 
-    def __init__(self, start_url: str, outdir: str, allowed_domains: list[str], **kwargs):
+    DENY_EXTENSIONS = frozenset({
+        "7z", "zip", "rar", "pdf", "jpg", "jpeg", "png", "gif", "svg",
+        "webp", "avif", "mp4", "mp3", "avi", "mov", "wmv", "mkv", "iso"
+    })
+
+    def __init__(self, start_url: str, queue: asyncio.Queue, allowed_domains: list[str],
+                 wait_networkidle: bool = False, **kwargs):
         super().__init__(**kwargs)
         self.start_urls = [start_url]
-        self.outdir = outdir
+        # canonical URLs already scheduled (within DEPTH_LIMIT) this crawl: skip before building a Request
+        self._seen: set[str] = {_strip_tracking(start_url)}
+        self.wait_networkidle = wait_networkidle
+        # (filename, pdf_bytes) per page, drained by /scrape into the ZIP stream
+        self.queue = queue
         self.allowed_domains = allowed_domains
-        # extract only same-site links; deny common binaries
-        self.link_extractor = LinkExtractor(
-            allow_domains=self.allowed_domains,
-            tags=("a",),
-            attrs=("href",),
-            deny=(),
-            deny_extensions=[
-                "7z", "zip", "rar", "pdf", "jpg", "jpeg", "png", "gif", "svg",
-                "webp", "avif", "mp4", "mp3", "avi", "mov", "wmv", "mkv", "iso"
-            ],
-        )
+        # follow only same-site links (subdomains included); deny common binaries
+        self._allowed = frozenset(d.lower() for d in allowed_domains)
+        self._allowed_suffixes = tuple("." + d for d in self._allowed)
+
+    def extract_links(self, response) -> list[str]:
+        """
+        One XPath pass over <a href> on the already-parsed response, resolved,
+        filtered to same-site pages and canonicalized (no fragment/trackers).
+        Order-preserving, deduped per page.
+        """
+        links = {}
+        for h in response.xpath("//a[@href]/@href").getall():
+            try:
+                u = response.urljoin(h.strip())
+                sp = urlsplit(u)
+                host = sp.hostname or ""
+                sp.port  # raises on an out-of-range / non-numeric port
+            except ValueError:
+                continue  # malformed href (e.g. "http://[bad"): skip it, keep the page
+            if sp.scheme not in ("http", "https"):
+                continue
+            if host not in self._allowed and not host.endswith(self._allowed_suffixes):
+                continue
+            if posixpath.splitext(sp.path)[1][1:].lower() in self.DENY_EXTENSIONS:
+                continue
+            links[_strip_tracking(u)] = None
+        return list(links)
+
+    def playwright_meta(self) -> dict:
+        # Request meta for a browser-rendered fetch (see PlaywrightFallbackMiddleware)
+        # Most pages are rendered by DOMContentLoaded (<body> exists by then);
+        # networkidle (no traffic for 500ms) can hang for seconds on beacons/
+        # long-polling, so it's opt-in. No page methods on the default path:
+        # scrapy-playwright follows every PageMethod with a wait for "load".
+        page_methods = []
+        if self.wait_networkidle:
+            page_methods.append(PageMethod("wait_for_load_state", "networkidle"))
+        return {
+            "playwright": True,
+            "playwright_page_goto_kwargs": {"wait_until": "domcontentloaded"},
+            "playwright_page_methods": page_methods,
+            # Use same context for all pages to keep cookies/session consistent if needed;
+            # the kwargs only apply when the handler first creates it
+            "playwright_context": "default",
+            "playwright_context_kwargs": PLAYWRIGHT_CONTEXT_KWARGS,
+        }
 
     def start_requests(self):
         yield scrapy.Request(
@@ -403,21 +596,12 @@ class SiteToPDFSpider(scrapy.Spider):
             callback=self.parse,
             errback=self.errback_first,
             dont_filter=True,
-            meta={
-                "playwright": True,
-                "playwright_page_methods": [
-                    ("wait_for_load_state", {"state": "networkidle"}),
-                ],
-                # Use same context for all pages to keep cookies/session consistent if needed
-                "playwright_context": "default",
-            },
         )
 
     def errback_first(self, failure):
         # Create an error PDF for the start URL
         url = self.start_urls[0]
         filename = sanitize_filename_from_url(url)
-        pdf_path = os.path.join(self.outdir, filename)
         payload = {
             "url": url,
             "title": "(Fetch error)",
@@ -427,43 +611,40 @@ class SiteToPDFSpider(scrapy.Spider):
             "outgoing_links": [],
         }
         try:
-            make_pdf(pdf_path, payload)
-            self.logger.warning(f"Wrote ERROR PDF: {pdf_path}")
+            self.queue.put_nowait((filename, make_pdf_bytes(payload)))
+            self.logger.warning(f"Wrote ERROR PDF: {filename}")
         except Exception as e:
             self.logger.error(f"Failed to write error PDF: {e}")
 
-    def parse(self, response: scrapy.http.Response):
+    async def parse(self, response: scrapy.http.Response):
         url = response.url
         title = (response.xpath("//title/text()").get() or "").strip()
 
-        # Use the rendered HTML for extraction
-        doc_html = response.text
-
-        # Clean, visible text (keeps *all* human-visible content; strips JS/CSS/hidden)
-        text = visible_text_from_html(doc_html, base_url=url)
+        # Clean, visible text (keeps *all* human-visible content; strips JS/CSS/hidden).
+        # Static pages arrive with it already extracted by the fallback middleware.
+        text = response.meta.get("visible_text")
+        if text is None:
+            doc_html = response.text  # rendered HTML from Playwright
+            text = visible_text_from_tree(parse_html(doc_html), base_url=url, document_html=doc_html)
 
         # Curated meta (optional; won't pollute PDF)
-        metas = meta_as_text(doc_html)
+        metas = meta_as_text_from_response(response)
 
         # Discover outgoing same-site links (and record them)
-        links = []
-        for link in self.link_extractor.extract_links(response):
-            href, _ = urldefrag(link.url)
-            href = _strip_tracking(href)
-            links.append(href)
-            yield response.follow(
-                href,
-                callback=self.parse,
-                meta={
-                    "playwright": True,
-                    "playwright_page_methods": [("wait_for_load_state", {"state": "networkidle"})],
-                    "playwright_context": "default",
-                },
-            )
+        links = self.extract_links(response)
+        # Only remember links DepthMiddleware will let through: an over-depth hit
+        # must not hide the URL from a shallower page that finishes later
+        limit = self.settings.getint("DEPTH_LIMIT")
+        within_depth = not limit or response.meta.get("depth", 0) + 1 <= limit
+        for href in links:
+            if href in self._seen:
+                continue
+            if within_depth:
+                self._seen.add(href)
+            yield response.follow(href, callback=self.parse)
 
-        # Write one PDF per page
-        filename = sanitize_filename_from_url(url)
-        pdf_path = os.path.join(self.outdir, filename)
+        # Write one PDF per page (tracker-param variants of a URL share a name)
+        filename = sanitize_filename_from_url(_strip_tracking(url))
         payload = {
             "url": url,
             "title": title or "(No title)",
@@ -473,8 +654,10 @@ class SiteToPDFSpider(scrapy.Spider):
             "outgoing_links": links,
         }
         try:
-            make_pdf(pdf_path, payload)
-            self.logger.info(f"Wrote PDF: {pdf_path}")
+            # ReportLab build is sync + CPU-bound: keep it off the reactor loop
+            pdf = await asyncio.to_thread(make_pdf_bytes, payload)
+            self.queue.put_nowait((filename, pdf))
+            self.logger.info(f"Wrote PDF: {filename}")
         except Exception as e:
             self.logger.error(f"Failed to write PDF for {url}: {e}")
 
@@ -482,67 +665,105 @@ class SiteToPDFSpider(scrapy.Spider):
 # Runner
 # ---------------------------
 configure_logging()
+logger = logging.getLogger(__name__)
 
-async def crawl_to_pdfs(start_url: str, depth: int, outdir: str):
+async def crawl_to_pdfs(start_url: str, depth: int, queue: asyncio.Queue, wait_networkidle: bool = False):
     """
-    Run a single crawl with the given depth limit and PDF output directory.
+    Run a single crawl with the given depth limit, pushing (filename, pdf_bytes) onto queue.
     """
-    allowed = same_site_allowed_domains(start_url)
+    allowed = list(same_site_allowed_domains(start_url))
 
-    runner = CrawlerRunner(settings={
-        "DEPTH_LIMIT": depth,
-        # reactor set via env & install above
-        "DOWNLOAD_HANDLERS": {
-            "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-            "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-        },
-        "PLAYWRIGHT_BROWSER_TYPE": "chromium",
-        "PLAYWRIGHT_DEFAULT_NAVIGATION_TIMEOUT": 60000,
-        "PLAYWRIGHT_LAUNCH_OPTIONS": {"headless": True},
-
-        # Mirror spider custom settings relevant to scheduler/priority
-        "DEPTH_PRIORITY": 1,
-        "SCHEDULER_DISK_QUEUE": "scrapy.squeues.PickleFifoDiskQueue",
-        "SCHEDULER_MEMORY_QUEUE": "scrapy.squeues.FifoMemoryQueue",
-    })
+    # Everything else (Playwright, scheduler, concurrency) lives in
+    # SiteToPDFSpider.custom_settings; reactor set via env & install above
+    runner = CrawlerRunner(settings={"DEPTH_LIMIT": depth})
 
     d = runner.crawl(
         SiteToPDFSpider,
         start_url=start_url,
-        outdir=outdir,
+        queue=queue,
+        wait_networkidle=wait_networkidle,
         allowed_domains=allowed,
     )
 
     loop = asyncio.get_running_loop()
-    await d.asFuture(loop)
+    try:
+        await d.asFuture(loop)
+    except asyncio.CancelledError:
+        # Nobody is reading the queue any more (client went away): stop crawling
+        runner.stop()
+        raise
     return True
 
+# ---------------------------
+# ZIP streaming
+# ---------------------------
+class _ZipSink:
+    """Write-only, unseekable file object: zipfile appends, we drain and yield."""
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+async def _stream_zip(first: tuple[str, bytes], queue: asyncio.Queue, crawl: asyncio.Future):
+    """
+    Yield the ZIP one PDF at a time as the crawl produces them; a None on the
+    queue marks the end of the crawl. Nothing touches disk. If the response is
+    abandoned early the crawl is cancelled; a crawl that failed is logged.
+    """
+    sink = _ZipSink()
+    seen = set()
+    item = first
+    try:
+        # PDFs are already Flate/JPEG compressed; deflating again buys ~1-3% for the full zlib cost
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as zf:
+            while item is not None:
+                name, data = item
+                if name not in seen:  # same sanitized name -> keep the first page only
+                    seen.add(name)
+                    zf.writestr(name, data)
+                    yield sink.drain()
+                item = await queue.get()
+        yield sink.drain()  # central directory
+    finally:
+        if not crawl.done():
+            crawl.cancel()
+        elif not crawl.cancelled() and crawl.exception() is not None:
+            logger.error("Crawl failed after streaming started", exc_info=crawl.exception())
+
 # ---------------------------
 # FastAPI endpoints
 # ---------------------------
 @app.post("/scrape")
 async def scrape(req: CrawlRequest):
-    workdir = tempfile.mkdtemp(prefix="scrape_pdfs_")
-    outdir = os.path.join(workdir, "pdfs")
-    os.makedirs(outdir, exist_ok=True)
-
     start_url = str(req.url)
 
-    try:
-        await crawl_to_pdfs(start_url, req.depth, outdir)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Crawl failed: {e}")
+    queue: asyncio.Queue = asyncio.Queue()
+    crawl = asyncio.ensure_future(crawl_to_pdfs(start_url, req.depth, queue, req.wait_networkidle))
+    crawl.add_done_callback(lambda _: queue.put_nowait(None))
 
-    pdf_files = [f for f in os.listdir(outdir) if f.lower().endswith(".pdf")]
-    if not pdf_files:
+    # Hold the response until the first page is in so failures still map to HTTP errors
+    first = await queue.get()
+    if first is None:
+        if not crawl.cancelled() and crawl.exception() is not None:
+            raise HTTPException(status_code=500, detail=f"Crawl failed: {crawl.exception()}")
         raise HTTPException(
             status_code=504,
             detail="Fetch timed out or was blocked before any page could be saved."
         )
 
-    zip_path = os.path.join(workdir, "result.zip")
-    with zipfile.ZipFile(zip_path, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for name in pdf_files:
-            zf.write(os.path.join(outdir, name), arcname=name)
-
-    return FileResponse(zip_path, media_type="application/zip", filename="scraped_pdfs.zip")
+    return StreamingResponse(
+        _stream_zip(first, queue, crawl),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="scraped_pdfs.zip"'},
+    )